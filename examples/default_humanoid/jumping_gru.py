@@ -12,7 +12,7 @@ from jaxtyping import Array
 
 import ksim
 
-from .walking import HumanoidWalkingTask
+from .walking import HumanoidWalkingTask, configure_xla
 from .walking_gru import HumanoidWalkingGRUTaskConfig
 
 
@@ -69,6 +69,7 @@ if __name__ == "__main__":
     #   python -m examples.default_humanoid.walking_gru
     # To visualize the environment, use the following command:
     #   python -m examples.default_humanoid.walking_gru run_environment=True
+    configure_xla()
     HumanoidJumpingGRUTask.launch(
         HumanoidJumpingGRUTaskConfig(
             num_envs=2048,
@@ -1,10 +1,14 @@
 """Defines simple task for training a walking policy for the default humanoid."""
 
+import functools
+import importlib.metadata
+import itertools
+import logging
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Generic, TypeVar
+from typing import Callable, Generic, TypeVar
 
-import distrax
 import equinox as eqx
 import jax
 import jax.numpy as jnp
@@ -12,14 +16,42 @@ import mujoco
 import optax
 import xax
 from flax.core import FrozenDict
-from jaxtyping import Array, PRNGKeyArray
+from jax import export
+from jax.typing import DTypeLike
+from jaxtyping import Array, PRNGKeyArray, PyTree
 from kscale.web.gen.api import JointMetadataOutput
 from mujoco import mjx
 
 import ksim
 
+logger = logging.getLogger(__name__)
+
 NUM_JOINTS = 21
 
+# Number of features produced by the shared actor-critic trunk.
+TRUNK_SIZE = 64
+
+# Sizes of the observations and commands taken by the exported inference
+# function, in the order they are concatenated.
+EXPORT_OBS_SIZES = {
+    "joint_position_observation": NUM_JOINTS,
+    "joint_velocity_observation": NUM_JOINTS,
+    "center_of_mass_inertia_observation": 160,
+    "center_of_mass_velocity_observation": 96,
+    "actuator_force_observation": NUM_JOINTS,
+}
+EXPORT_CMD_SIZES = {
+    "linear_velocity_step_command": 2,
+    "angular_velocity_step_command": 1,
+}
+
+XLA_CACHE_DIR = Path("~/.cache/ksim_xla").expanduser()
+
+XLA_GPU_FLAGS = (
+    "--xla_gpu_enable_latency_hiding_scheduler=true",
+    "--xla_gpu_enable_triton_gemm=true",
+)
+
 
 @jax.tree_util.register_dataclass
 @dataclass(frozen=True)
@@ -28,15 +60,140 @@ class AuxOutputs:
     values: Array
 
 
+@jax.tree_util.register_dataclass
+@dataclass(frozen=True)
+class PolicyInputs:
+    dh_joint_pos_n: Array  # NUM_JOINTS
+    dh_joint_vel_n: Array  # NUM_JOINTS
+    com_inertia_n: Array  # 160
+    com_vel_n: Array  # 96
+    act_frc_obs_n: Array  # NUM_JOINTS
+    lin_vel_obs_3: Array  # 3
+    ang_vel_obs_3: Array  # 3
+    lin_vel_cmd_2: Array  # 2
+    ang_vel_cmd_1: Array  # 1
+
+
+def has_cuda_plugin() -> bool:
+    """Checks if a CUDA plugin is installed for JAX, without initializing it.
+
+    JAX discovers its PJRT plugins through the `jax_plugins` entry point
+    group, where the CUDA plugins register names like `xla_cuda12`, so this
+    matches any CUDA version.
+    """
+    return any("cuda" in plugin.name for plugin in importlib.metadata.entry_points(group="jax_plugins"))
+
+
+def configure_xla(cache_dir: Path = XLA_CACHE_DIR) -> None:
+    """Enables the persistent compilation cache and sets the GPU XLA flags.
+
+    This needs to be called before the first JAX computation, since XLA only
+    reads its flags when the backend is initialized. Flags which are already
+    set in `XLA_FLAGS` take precedence over the defaults.
+    """
+    jax.config.update("jax_compilation_cache_dir", str(cache_dir))
+    jax.config.update("jax_persistent_cache_min_entry_size_bytes", 0)
+
+    # The GPU flags are rejected by CPU-only builds of XLA.
+    if has_cuda_plugin():
+        os.environ["XLA_FLAGS"] = " ".join([*XLA_GPU_FLAGS, os.environ.get("XLA_FLAGS", "")]).strip()
+
+
+def flatten_leading_dims(x: Array, num_dims: int) -> Array:
+    """Folds the first `num_dims` dimensions of an array into one."""
+    return x.reshape(-1, *x.shape[num_dims:])
+
+
+def cast_floating(tree: PyTree, dtype: DTypeLike) -> PyTree:
+    """Casts the floating-point arrays in a PyTree to the given dtype."""
+    return jax.tree.map(lambda x: x.astype(dtype) if eqx.is_inexact_array(x) else x, tree)
+
+
+def init_linear(key: PRNGKeyArray, in_size: int, out_size: int) -> tuple[Array, Array]:
+    """Initializes a linear layer the same way as `eqx.nn.Linear`."""
+    w_key, b_key = jax.random.split(key)
+    lim = 1 / in_size**0.5
+    weight = jax.random.uniform(w_key, (in_size, out_size), minval=-lim, maxval=lim)
+    bias = jax.random.uniform(b_key, (out_size,), minval=-lim, maxval=lim)
+    return weight, bias
+
+
+def normal_log_prob(x: Array, mean: Array, std: Array) -> Array:
+    """Log probability of `x` under a normal distribution."""
+    return -0.5 * jnp.square((x - mean) / std) - jnp.log(std) - 0.5 * jnp.log(2 * jnp.pi)
+
+
+def normal_entropy(std: Array) -> Array:
+    """Entropy of a normal distribution with the given standard deviation."""
+    return 0.5 + 0.5 * jnp.log(2 * jnp.pi) + jnp.log(std)
+
+
+def normal_sample(key: PRNGKeyArray, mean: Array, std: Array) -> Array:
+    """Samples from a normal distribution."""
+    return mean + std * jax.random.normal(key, mean.shape, dtype=mean.dtype)
+
+
+def split_mean_std(
+    prediction: Array,
+    mean_scale: float,
+    var_scale: float,
+    min_std: float,
+    max_std: float,
+) -> tuple[Array, Array]:
+    """Splits an actor prediction into a scaled mean and a positive std.
+
+    Both activations are computed in one place, directly on the output of
+    the last layer, so XLA can fuse them into a single elementwise kernel.
+    """
+    mean, raw_std = jnp.split(prediction, 2, axis=-1)
+    return jnp.tanh(mean) * mean_scale, jnp.clip((jax.nn.softplus(raw_std) + min_std) * var_scale, max=max_std)
+
+
+class StackedMLP(eqx.Module):
+    """ReLU MLP whose hidden layers are stacked and applied with a scan.
+
+    All the hidden-to-hidden layers have the same shape, so they are stored as
+    a single stacked array and run as one loop, rather than as separate
+    layers which each get their own kernel launches.
+    """
+
+    w_in: Array
+    b_in: Array
+    w_hidden: Array
+    b_hidden: Array
+    w_out: Array
+    b_out: Array
+
+    def __init__(self, key: PRNGKeyArray, *, in_size: int, out_size: int, width_size: int, depth: int) -> None:
+        if depth < 1:
+            raise ValueError("Depth must be at least 1")
+        in_key, hidden_key, out_key = jax.random.split(key, 3)
+        hidden_keys = jax.random.split(hidden_key, depth - 1)
+        init_hidden_fn = functools.partial(init_linear, in_size=width_size, out_size=width_size)
+
+        self.w_in, self.b_in = init_linear(in_key, in_size, width_size)
+        self.w_hidden, self.b_hidden = jax.vmap(init_hidden_fn)(hidden_keys)
+        self.w_out, self.b_out = init_linear(out_key, width_size, out_size)
+
+    def __call__(self, x_n: Array) -> Array:
+        def scan_fn(h_n: Array, layer: tuple[Array, Array]) -> tuple[Array, None]:
+            w_hidden, b_hidden = layer
+            return jax.nn.relu(h_n @ w_hidden + b_hidden), None
+
+        h_n = jax.nn.relu(x_n @ self.w_in + self.b_in)
+        h_n, _ = jax.lax.scan(scan_fn, h_n, (self.w_hidden, self.b_hidden))
+        return h_n @ self.w_out + self.b_out
+
+
 class NaiveVelocityReward(ksim.Reward):
     def __call__(self, trajectory: ksim.Trajectory) -> Array:
         return trajectory.qvel[..., 0].clip(max=5.0)
 
 
 class DefaultHumanoidActor(eqx.Module):
-    """Actor for the walking task."""
+    """Actor head for the walking task, on top of the shared trunk."""
 
-    mlp: eqx.nn.MLP
+    mlp: StackedMLP
     min_std: float = eqx.static_field()
     max_std: float = eqx.static_field()
     var_scale: float = eqx.static_field()
@@ -51,124 +208,128 @@ class DefaultHumanoidActor(eqx.Module):
         var_scale: float,
         mean_scale: float,
     ) -> None:
-        num_inputs = NUM_JOINTS + NUM_JOINTS + 160 + 96 + NUM_JOINTS + 2 + 1
         num_outputs = NUM_JOINTS
 
-        self.mlp = eqx.nn.MLP(
-            in_size=num_inputs,
+        self.mlp = StackedMLP(
+            key,
+            in_size=TRUNK_SIZE,
             out_size=num_outputs * 2,
             width_size=64,
-            depth=5,
-            key=key,
-            activation=jax.nn.relu,
+            depth=2,
         )
         self.min_std = min_std
         self.max_std = max_std
         self.var_scale = var_scale
         self.mean_scale = mean_scale
 
-    def __call__(
-        self,
-        dh_joint_pos_n: Array,
-        dh_joint_vel_n: Array,
-        com_inertia_n: Array,
-        com_vel_n: Array,
-        act_frc_obs_n: Array,
-        lin_vel_cmd_2: Array,
-        ang_vel_cmd_1: Array,
-    ) -> distrax.Normal:
-        obs_n = jnp.concatenate(
-            [
-                dh_joint_pos_n,  # NUM_JOINTS
-                dh_joint_vel_n,  # NUM_JOINTS
-                com_inertia_n,  # 160
-                com_vel_n,  # 96
-                act_frc_obs_n,  # 21
-                lin_vel_cmd_2,  # 2
-                ang_vel_cmd_1,  # 1
-            ],
-            axis=-1,
-        )
-
-        prediction_n = self.mlp(obs_n)
-        mean_n = prediction_n[..., :NUM_JOINTS]
-        std_n = prediction_n[..., NUM_JOINTS:]
-
-        # Scale the mean.
-        mean_n = jnp.tanh(mean_n) * self.mean_scale
-
-        # Softplus and clip to ensure positive standard deviations.
-        std_n = jnp.clip((jax.nn.softplus(std_n) + self.min_std) * self.var_scale, max=self.max_std)
-
-        # return distrax.Transformed(distrax.Normal(mean_n, std_n), distrax.Tanh())
-        return distrax.Normal(mean_n, std_n)
+    def __call__(self, features_n: Array) -> tuple[Array, Array]:
+        prediction_n = self.mlp(features_n).astype(jnp.float32)
+        return split_mean_std(prediction_n, self.mean_scale, self.var_scale, self.min_std, self.max_std)
 
 
 class DefaultHumanoidCritic(eqx.Module):
-    """Critic for the walking task."""
+    """Critic head for the walking task, on top of the shared trunk."""
 
-    mlp: eqx.nn.MLP
+    mlp: StackedMLP
 
     def __init__(self, key: PRNGKeyArray) -> None:
-        num_inputs = NUM_JOINTS + NUM_JOINTS + 160 + 96 + NUM_JOINTS + 3 + 3 + 2 + 1
         num_outputs = 1
 
-        self.mlp = eqx.nn.MLP(
-            in_size=num_inputs,
+        self.mlp = StackedMLP(
+            key,
+            in_size=TRUNK_SIZE + 3 + 3,
             out_size=num_outputs,
             width_size=64,
-            depth=5,
-            key=key,
-            activation=jax.nn.relu,
+            depth=2,
         )
 
-    def __call__(
-        self,
-        dh_joint_pos_n: Array,
-        dh_joint_vel_n: Array,
-        com_inertia_n: Array,
-        com_vel_n: Array,
-        act_frc_obs_n: Array,
-        lin_vel_obs_3: Array,
-        ang_vel_obs_3: Array,
-        lin_vel_cmd_2: Array,
-        ang_vel_cmd_1: Array,
-    ) -> Array:
+    def __call__(self, features_n: Array, lin_vel_obs_3: Array, ang_vel_obs_3: Array) -> Array:
+        # The critic also sees the base velocities, which the actor does not
+        # have access to.
         x_n = jnp.concatenate(
             [
-                dh_joint_pos_n,  # NUM_JOINTS
-                dh_joint_vel_n,  # NUM_JOINTS
-                com_inertia_n,  # 160
-                com_vel_n,  # 96
-                act_frc_obs_n,  # 21
-                lin_vel_obs_3,  # 3
-                ang_vel_obs_3,  # 3
-                lin_vel_cmd_2,  # 2
-                ang_vel_cmd_1,  # 1
+                features_n,  # TRUNK_SIZE
+                lin_vel_obs_3.astype(features_n.dtype),  # 3
+                ang_vel_obs_3.astype(features_n.dtype),  # 3
             ],
             axis=-1,
         )
-        return self.mlp(x_n)
+        return self.mlp(x_n).astype(jnp.float32)
 
 
 class DefaultHumanoidModel(eqx.Module):
+    """Actor-critic model, where the actor and critic share a trunk.
+
+    The trunk is evaluated once per observation and its features are passed
+    to both heads, so only the last few layers are duplicated. The parameters
+    are stored in float32 and only cast to `compute_dtype` for the forward
+    pass, so the optimizer keeps full-precision master weights.
+    """
+
+    trunk: StackedMLP
     actor: DefaultHumanoidActor
     critic: DefaultHumanoidCritic
+    lin_vel_cmd_axes: tuple[int, ...] = eqx.static_field()
+    compute_dtype: DTypeLike = eqx.static_field()
 
-    def __init__(self, key: PRNGKeyArray) -> None:
+    def __init__(
+        self,
+        key: PRNGKeyArray,
+        *,
+        lin_vel_cmd_axes: tuple[int, ...] = (0, 1),
+        compute_dtype: DTypeLike = jnp.float32,
+    ) -> None:
+        trunk_key, actor_key, critic_key = jax.random.split(key, 3)
+        num_inputs = NUM_JOINTS + NUM_JOINTS + 160 + 96 + NUM_JOINTS + len(lin_vel_cmd_axes) + 1
+
+        self.trunk = StackedMLP(
+            trunk_key,
+            in_size=num_inputs,
+            out_size=TRUNK_SIZE,
+            width_size=64,
+            depth=3,
+        )
         self.actor = DefaultHumanoidActor(
-            key,
+            actor_key,
             min_std=0.01,
             max_std=1.0,
             var_scale=1.0,
             mean_scale=1.0,
         )
-        self.critic = DefaultHumanoidCritic(key)
+        self.critic = DefaultHumanoidCritic(critic_key)
+        self.lin_vel_cmd_axes = lin_vel_cmd_axes
+        self.compute_dtype = compute_dtype
+
+    def _encode(self, obs_n: Array) -> tuple["DefaultHumanoidModel", Array]:
+        model = cast_floating(self, self.compute_dtype)
+        return model, jax.nn.relu(model.trunk(obs_n.astype(self.compute_dtype)))
+
+    def run_actor(self, obs_n: Array) -> tuple[Array, Array]:
+        model, features_n = self._encode(obs_n)
+        return model.actor(features_n)
+
+    def run_critic(self, obs_n: Array, lin_vel_obs_3: Array, ang_vel_obs_3: Array) -> Array:
+        model, features_n = self._encode(obs_n)
+        return model.critic(features_n, lin_vel_obs_3, ang_vel_obs_3)
+
+    def __call__(
+        self,
+        obs_n: Array,
+        lin_vel_obs_3: Array,
+        ang_vel_obs_3: Array,
+    ) -> tuple[tuple[Array, Array], Array]:
+        model, features_n = self._encode(obs_n)
+        return model.actor(features_n), model.critic(features_n, lin_vel_obs_3, ang_vel_obs_3)
 
 
 @dataclass
 class HumanoidWalkingTaskConfig(ksim.PPOConfig):
-    """Config for the humanoid walking task."""
+    """Config for the humanoid walking task.
+
+    When launched as a script, the persistent XLA compilation cache is stored
+    in `XLA_CACHE_DIR`, and on CUDA builds the flags in `XLA_GPU_FLAGS` enable
+    the latency-hiding scheduler and Triton GEMM kernels. See `configure_xla`.
+    """
 
     # Reward parameters.
     use_naive_reward: bool = xax.field(
@@ -176,6 +337,19 @@ class HumanoidWalkingTaskConfig(ksim.PPOConfig):
         help="Whether to use the naive velocity reward.",
     )
 
+    # Model parameters.
+    use_bf16: bool = xax.field(
+        value=False,
+        help="Whether to run the actor and critic MLPs in bfloat16. Parameters are kept in float32.",
+    )
+    cpu_action_threshold: int = xax.field(
+        value=1024,
+        help=(
+            "Train the shared-trunk MLP policy on the CPU when the number of actions per step "
+            "(num_envs * NUM_JOINTS) is below this, since such small batches cannot hide accelerator dispatch latency."
+        ),
+    )
+
     # Optimizer parameters.
     learning_rate: float = xax.field(
         value=1e-4,
@@ -221,7 +395,7 @@ class HumanoidWalkingTaskConfig(ksim.PPOConfig):
     # Checkpointing parameters.
     export_for_inference: bool = xax.field(
         value=False,
-        help="Whether to export the model for inference.",
+        help="Whether to export an ahead-of-time compiled inference function next to each checkpoint.",
     )
 
 
@@ -246,11 +420,31 @@ class HumanoidWalkingTask(ksim.PPOTask[Config], Generic[Config]):
 
         return optimizer
 
+    def should_train_on_cpu(self) -> bool:
+        # With only a few environments, each step of the small MLP policy is
+        # too little work to make up for the accelerator's dispatch latency.
+        return self.config.num_envs * NUM_JOINTS < self.config.cpu_action_threshold
+
+    def run_training(self) -> None:
+        # Rollouts and updates are traced into the same function, so the
+        # device is chosen for the whole training loop.
+        if not self.should_train_on_cpu():
+            super().run_training()
+            return
+
+        logger.info(
+            "Training on the CPU, since num_envs * NUM_JOINTS = %d is below cpu_action_threshold = %d. "
+            "Set cpu_action_threshold=0 to train on the default device instead.",
+            self.config.num_envs * NUM_JOINTS,
+            self.config.cpu_action_threshold,
+        )
+        with jax.default_device(jax.devices("cpu")[0]):
+            super().run_training()
+
     def get_mujoco_model(self) -> tuple[mujoco.MjModel, dict[str, JointMetadataOutput]]:
-        mjcf_path = (Path(__file__).parent / "scene.mjcf").resolve().as_posix()
-        mj_model = mujoco.MjModel.from_xml_path(mjcf_path)
+        mj_model = ksim.load_mjcf_model(Path(__file__).parent / "scene.mjcf")
 
-        mj_model.opt.timestep = jnp.array(self.config.dt)
+        mj_model.opt.timestep = float(self.config.dt)
         mj_model.opt.iterations = 6
         mj_model.opt.ls_iterations = 6
         mj_model.opt.disableflags = mjx.DisableBit.EULERDAMP
@@ -367,61 +561,123 @@ class HumanoidWalkingTask(ksim.PPOTask[Config], Generic[Config]):
             ksim.FastAccelerationTermination(),
         ]
 
+    def get_lin_vel_cmd_axes(self) -> tuple[int, ...]:
+        # Command axes which are always zero are left out of the model inputs.
+        # They are read from the command that `get_commands` actually returns,
+        # so that they stay in sync when a subclass changes the commands.
+        commands = [
+            command
+            for command in self.get_commands(self.get_mujoco_model())
+            if command.command_name == "linear_velocity_step_command"
+        ]
+        if len(commands) != 1 or not isinstance(commands[0], ksim.LinearVelocityStepCommand):
+            raise ValueError("Expected `get_commands` to return exactly one `LinearVelocityStepCommand`")
+        return commands[0].nonzero_axes
+
     def get_model(self, key: PRNGKeyArray) -> DefaultHumanoidModel:
-        return DefaultHumanoidModel(key)
+        return DefaultHumanoidModel(
+            key,
+            lin_vel_cmd_axes=self.get_lin_vel_cmd_axes(),
+            compute_dtype=jnp.bfloat16 if self.config.use_bf16 else jnp.float32,
+        )
 
     def get_initial_carry(self, rng: PRNGKeyArray) -> None:
         return None
 
-    def _run_actor(
+    def get_policy_inputs(
         self,
-        model: DefaultHumanoidModel,
         observations: FrozenDict[str, Array],
         commands: FrozenDict[str, Array],
-    ) -> distrax.Normal:
-        dh_joint_pos_n = observations["joint_position_observation"]
-        dh_joint_vel_n = observations["joint_velocity_observation"] / 50.0
-        com_inertia_n = observations["center_of_mass_inertia_observation"]
-        com_vel_n = observations["center_of_mass_velocity_observation"] / 50.0
-        act_frc_obs_n = observations["actuator_force_observation"] / 100.0
-        lin_vel_cmd_2 = commands["linear_velocity_step_command"]
-        ang_vel_cmd_1 = commands["angular_velocity_step_command"]
-        return model.actor(
-            dh_joint_pos_n,
-            dh_joint_vel_n,
-            com_inertia_n,
-            com_vel_n,
-            act_frc_obs_n,
-            lin_vel_cmd_2,
-            ang_vel_cmd_1,
+    ) -> PolicyInputs:
+        # All the input normalization happens here, so that training and the
+        # exported inference function always see the same scaled inputs.
+        return PolicyInputs(
+            dh_joint_pos_n=observations["joint_position_observation"],
+            dh_joint_vel_n=observations["joint_velocity_observation"] / 50.0,
+            com_inertia_n=observations["center_of_mass_inertia_observation"],
+            com_vel_n=observations["center_of_mass_velocity_observation"] / 50.0,
+            act_frc_obs_n=observations["actuator_force_observation"] * 0.01,
+            lin_vel_obs_3=observations["base_linear_velocity_observation"],
+            ang_vel_obs_3=observations["base_angular_velocity_observation"],
+            lin_vel_cmd_2=commands["linear_velocity_step_command"],
+            ang_vel_cmd_1=commands["angular_velocity_step_command"],
         )
 
-    def _run_critic(
+    def _get_trunk_inputs(self, model: DefaultHumanoidModel, inputs: PolicyInputs) -> Array:
+        return jnp.concatenate(
+            [
+                inputs.dh_joint_pos_n,  # NUM_JOINTS
+                inputs.dh_joint_vel_n,  # NUM_JOINTS
+                inputs.com_inertia_n,  # 160
+                inputs.com_vel_n,  # 96
+                inputs.act_frc_obs_n,  # 21
+                inputs.lin_vel_cmd_2[..., list(model.lin_vel_cmd_axes)],  # len(lin_vel_cmd_axes)
+                inputs.ang_vel_cmd_1,  # 1
+            ],
+            axis=-1,
+        )
+
+    def _run_actor(self, model: DefaultHumanoidModel, inputs: PolicyInputs) -> tuple[Array, Array]:
+        return model.run_actor(self._get_trunk_inputs(model, inputs))
+
+    def _run_critic(self, model: DefaultHumanoidModel, inputs: PolicyInputs) -> Array:
+        return model.run_critic(self._get_trunk_inputs(model, inputs), inputs.lin_vel_obs_3, inputs.ang_vel_obs_3)
+
+    def _run_actor_critic(
         self,
         model: DefaultHumanoidModel,
-        observations: FrozenDict[str, Array],
-        commands: FrozenDict[str, Array],
-    ) -> Array:
-        dh_joint_pos_n = observations["joint_position_observation"]  # 26
-        dh_joint_vel_n = observations["joint_velocity_observation"]  # 27
-        com_inertia_n = observations["center_of_mass_inertia_observation"]  # 160
-        com_vel_n = observations["center_of_mass_velocity_observation"]  # 96
-        act_frc_obs_n = observations["actuator_force_observation"] / 100.0  # 21
-        lin_vel_obs_3 = observations["base_linear_velocity_observation"]  # 3
-        ang_vel_obs_3 = observations["base_angular_velocity_observation"]  # 3
-        lin_vel_cmd_2 = commands["linear_velocity_step_command"]  # 2
-        ang_vel_cmd_1 = commands["angular_velocity_step_command"]  # 1
-        return model.critic(
-            dh_joint_pos_n,
-            dh_joint_vel_n,
-            com_inertia_n,
-            com_vel_n,
-            act_frc_obs_n,
-            lin_vel_obs_3,
-            ang_vel_obs_3,
-            lin_vel_cmd_2,
-            ang_vel_cmd_1,
+        inputs: PolicyInputs,
+    ) -> tuple[tuple[Array, Array], Array]:
+        return model(self._get_trunk_inputs(model, inputs), inputs.lin_vel_obs_3, inputs.ang_vel_obs_3)
+
+    def make_export_model(self, model: DefaultHumanoidModel) -> Callable[[Array, Array], Array]:
+        """Returns a function mapping a single observation and command to the mean action.
+
+        The observation and command are the concatenations of the arrays in
+        `EXPORT_OBS_SIZES` and `EXPORT_CMD_SIZES`, respectively.
+        """
+        if not isinstance(model, DefaultHumanoidModel):
+            raise TypeError(f"Inference export only supports the walking MLP model, got {type(model).__module__}")
+
+        def split(x: Array, sizes: dict[str, int]) -> FrozenDict[str, Array]:
+            splits = jnp.split(x, list(itertools.accumulate(sizes.values()))[:-1], axis=-1)
+            return FrozenDict(zip(sizes.keys(), splits))
+
+        def model_fn(obs: Array, cmd: Array) -> Array:
+            # The base velocities are only used by the critic.
+            observations = split(obs, EXPORT_OBS_SIZES).copy(
+                {
+                    "base_linear_velocity_observation": jnp.zeros(3, dtype=obs.dtype),
+                    "base_angular_velocity_observation": jnp.zeros(3, dtype=obs.dtype),
+                }
+            )
+            mean_n, _ = self._run_actor(model, self.get_policy_inputs(observations, split(cmd, EXPORT_CMD_SIZES)))
+            return mean_n
+
+        return model_fn
+
+    def on_after_checkpoint_save(self, ckpt_path: Path, state: xax.State) -> xax.State:
+        state = super().on_after_checkpoint_save(ckpt_path, state)
+        if not self.config.export_for_inference:
+            return state
+
+        # Only the feed-forward walking model can be exported, since recurrent
+        # models also need their hidden state as an input.
+        model = self.load_checkpoint(ckpt_path, part="model")
+        if not isinstance(model, DefaultHumanoidModel):
+            logger.warning("Skipping the inference export, which only supports the walking MLP model")
+            return state
+
+        # Serializes the lowered policy, so that deployment can load it with
+        # `jax.export.deserialize` without tracing the model again.
+        exported = export.export(jax.jit(self.make_export_model(model)), platforms=["cpu"])(
+            jax.ShapeDtypeStruct((sum(EXPORT_OBS_SIZES.values()),), jnp.float32),
+            jax.ShapeDtypeStruct((sum(EXPORT_CMD_SIZES.values()),), jnp.float32),
         )
+        export_path = ckpt_path.parent / "aot_model.bin"
+        export_path.write_bytes(exported.serialize())
+        logger.info("Exported inference model to %s", export_path)
+        return state
 
     def get_on_policy_log_probs(
         self,
@@ -443,36 +699,69 @@ class HumanoidWalkingTask(ksim.PPOTask[Config], Generic[Config]):
             raise ValueError("No aux outputs found in trajectories")
         return trajectories.aux_outputs.values
 
-    def get_log_probs(
+    def _get_flat_policy_inputs(self, trajectories: ksim.Trajectory) -> PolicyInputs:
+        # The policy has no temporal state, so all leading dimensions are
+        # folded into one and the model is evaluated as a single batch. Like
+        # a scan, the vmap only traces the model once, so the compiled graph
+        # does not grow with the rollout length, and this avoids running the
+        # time steps one after another.
+        flatten_fn = functools.partial(flatten_leading_dims, num_dims=trajectories.done.ndim)
+        return jax.tree.map(flatten_fn, self.get_policy_inputs(trajectories.obs, trajectories.command))
+
+    def _get_action_log_probs(
         self,
         model: DefaultHumanoidModel,
         trajectories: ksim.Trajectory,
-        rng: PRNGKeyArray,
+        mean_n: Array,
+        std_n: Array,
     ) -> tuple[Array, Array]:
-        # Vectorize over both batch and time dimensions.
-        par_fn = jax.vmap(self._run_actor, in_axes=(None, 0, 0))
-        action_dist_btn = par_fn(model, trajectories.obs, trajectories.command)
-
         # Compute the log probabilities of the trajectory's actions according
         # to the current policy, along with the entropy of the distribution.
-        action_btn = trajectories.action / model.actor.mean_scale
-        log_probs_btn = action_dist_btn.log_prob(action_btn)
-        entropy_btn = action_dist_btn.entropy()
-
+        # The entropy is computed even when the entropy bonus is disabled,
+        # since it is still logged as a training metric.
+        action_n = flatten_leading_dims(trajectories.action, trajectories.done.ndim) / model.actor.mean_scale
+        log_probs_btn = normal_log_prob(action_n, mean_n, std_n).reshape(trajectories.action.shape)
+        entropy_btn = normal_entropy(std_n).reshape(trajectories.action.shape)
         return log_probs_btn, entropy_btn
 
+    def get_log_probs(
+        self,
+        model: DefaultHumanoidModel,
+        trajectories: ksim.Trajectory,
+        rng: PRNGKeyArray,
+    ) -> tuple[Array, Array]:
+        inputs_n = self._get_flat_policy_inputs(trajectories)
+        mean_n, std_n = jax.vmap(self._run_actor, in_axes=(None, 0))(model, inputs_n)
+        return self._get_action_log_probs(model, trajectories, mean_n, std_n)
+
     def get_values(
         self,
         model: DefaultHumanoidModel,
         trajectories: ksim.Trajectory,
         rng: PRNGKeyArray,
     ) -> Array:
-        # Vectorize over both batch and time dimensions.
-        par_fn = jax.vmap(self._run_critic, in_axes=(None, 0, 0))
-        values_bt1 = par_fn(model, trajectories.obs, trajectories.command)
+        inputs_n = self._get_flat_policy_inputs(trajectories)
+        values_n1 = jax.vmap(self._run_critic, in_axes=(None, 0))(model, inputs_n)
 
-        # Remove the last dimension.
-        return values_bt1.squeeze(-1)
+        # Restore the batch and time dimensions, removing the last dimension.
+        return values_n1.reshape(trajectories.done.shape)
+
+    def get_log_probs_and_values(
+        self,
+        model: DefaultHumanoidModel,
+        trajectories: ksim.Trajectory,
+        rng: PRNGKeyArray,
+    ) -> tuple[Array, Array | None, Array]:
+        # Only the feed-forward walking model can run the actor and critic in
+        # a single pass, so other models evaluate them separately.
+        if not isinstance(model, DefaultHumanoidModel):
+            return super().get_log_probs_and_values(model, trajectories, rng)
+
+        # Runs the actor and critic in a single vectorized pass.
+        inputs_n = self._get_flat_policy_inputs(trajectories)
+        (mean_n, std_n), values_n1 = jax.vmap(self._run_actor_critic, in_axes=(None, 0))(model, inputs_n)
+        log_probs_btn, entropy_btn = self._get_action_log_probs(model, trajectories, mean_n, std_n)
+        return log_probs_btn, entropy_btn, values_n1.reshape(trajectories.done.shape)
 
     def sample_action(
         self,
@@ -483,12 +772,11 @@ class HumanoidWalkingTask(ksim.PPOTask[Config], Generic[Config]):
         commands: FrozenDict[str, Array],
         rng: PRNGKeyArray,
     ) -> tuple[Array, None, AuxOutputs]:
-        action_dist_n = self._run_actor(model, observations, commands)
-        action_n = action_dist_n.sample(seed=rng)
-        action_log_prob_n = action_dist_n.log_prob(action_n)
-
-        critic_n = self._run_critic(model, observations, commands)
-        value_n = critic_n.squeeze(-1)
+        inputs = self.get_policy_inputs(observations, commands)
+        (mean_n, std_n), critic_1 = self._run_actor_critic(model, inputs)
+        action_n = normal_sample(rng, mean_n, std_n)
+        action_log_prob_n = normal_log_prob(action_n, mean_n, std_n)
+        value_n = critic_1.squeeze(-1)
 
         return action_n, None, AuxOutputs(log_probs=action_log_prob_n, values=value_n)
 
@@ -502,6 +790,10 @@ if __name__ == "__main__":
     # of environments and batch size to reduce memory usage. Here's an example
     # from the command line:
     #   python -m examples.default_humanoid.walking num_envs=8 num_batches=2
+    # Small runs, such as this one, train on the CPU (see
+    # `cpu_action_threshold`). Pass cpu_action_threshold=0 to keep them on
+    # the accelerator.
+    configure_xla()
     HumanoidWalkingTask.launch(
         HumanoidWalkingTaskConfig(
             num_envs=2048,
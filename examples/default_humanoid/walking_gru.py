@@ -13,7 +13,7 @@ from jaxtyping import Array, PRNGKeyArray
 
 import ksim
 
-from .walking import HumanoidWalkingTask, HumanoidWalkingTaskConfig
+from .walking import HumanoidWalkingTask, HumanoidWalkingTaskConfig, configure_xla
 
 NUM_JOINTS = 21
 HIDDEN_SIZE = 512  # `_s`
@@ -218,6 +218,10 @@ class HumanoidWalkingGRUTask(HumanoidWalkingTask[Config], Generic[Config]):
     def get_model(self, key: PRNGKeyArray) -> DefaultHumanoidModel:
         return DefaultHumanoidModel(key)
 
+    def should_train_on_cpu(self) -> bool:
+        # The CPU threshold is tuned for the walking task's MLP, not the GRU.
+        return False
+
     def get_initial_carry(self, rng: PRNGKeyArray) -> Array:
         # Initialize the hidden state for GRU
         return jnp.zeros((DEPTH, HIDDEN_SIZE))
@@ -351,6 +355,7 @@ if __name__ == "__main__":
     #   python -m examples.default_humanoid.walking_gru
     # To visualize the environment, use the following command:
     #   python -m examples.default_humanoid.walking_gru run_environment=True
+    configure_xla()
     HumanoidWalkingGRUTask.launch(
         HumanoidWalkingGRUTaskConfig(
             num_envs=2048,
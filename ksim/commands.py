@@ -74,6 +74,13 @@ class Command(ABC):
 VelocityAxis = Literal["x", "y"]
 
 
+def _nonzero_axes(*axes: tuple[tuple[float, float], float]) -> tuple[int, ...]:
+    """Returns the indices of the `(value_range, zero_prob)` axes which can be non-zero."""
+    return tuple(
+        i for i, (value_range, zero_prob) in enumerate(axes) if tuple(value_range) != (0.0, 0.0) and zero_prob < 1.0
+    )
+
+
 @attrs.define(kw_only=True)
 class LinearVelocityArrow(Marker):
     command_name: str = attrs.field()
@@ -159,6 +166,11 @@ class LinearVelocityCommand(Command):
     def __call__(self, prev_command: Array, time: Array, rng: PRNGKeyArray) -> Array:
         return prev_command
 
+    @property
+    def nonzero_axes(self) -> tuple[int, ...]:
+        """The indices of the command axes which can take non-zero values."""
+        return _nonzero_axes((self.x_range, self.x_zero_prob), (self.y_range, self.y_zero_prob))
+
     def get_markers(self) -> Collection[Marker]:
         return [
             LinearVelocityArrow.get(self.command_name, "x", self.vis_height, self.vis_scale),
@@ -214,6 +226,11 @@ class LinearVelocityStepCommand(Command):
     def __call__(self, prev_command: Array, time: Array, rng: PRNGKeyArray) -> Array:
         return prev_command
 
+    @property
+    def nonzero_axes(self) -> tuple[int, ...]:
+        """The indices of the command axes which can take non-zero values."""
+        return _nonzero_axes((self.x_range, self.x_zero_prob), (self.y_range, self.y_zero_prob))
+
     def get_markers(self) -> Collection[Marker]:
         return [
             LinearVelocityArrow.get(self.command_name, "x", self.vis_height, self.vis_scale),
@@ -341,6 +341,33 @@ class PPOTask(RLTask[Config], Generic[Config], ABC):
             The state-value estimates for the given trajectories, with shape (B, T).
         """
 
+    def get_log_probs_and_values(
+        self,
+        model: PyTree,
+        trajectories: Trajectory,
+        rng: PRNGKeyArray,
+    ) -> tuple[Array, Array | None, Array]:
+        """Gets the log probabilities and state-value estimates together.
+
+        By default this just calls `get_log_probs` and `get_values`. Tasks
+        whose actor and critic share inputs can override it to evaluate both
+        in a single pass over the trajectories.
+
+        Args:
+            model: The user-provided model.
+            trajectories: The batch of trajectories to evaluate.
+            rng: A random seed.
+
+        Returns:
+            The log probabilities of the given actions, with shape (B, T, *A),
+            the entropy of the action distribution, with shape (B, T, *A) or
+            None, and the state-value estimates, with shape (B, T).
+        """
+        log_probs_rng, values_rng = jax.random.split(rng)
+        log_probs, entropy = self.get_log_probs(model, trajectories, log_probs_rng)
+        values = self.get_values(model, trajectories, values_rng)
+        return log_probs, entropy, values
+
     def get_ppo_metrics(
         self,
         trajectories: Trajectory,
@@ -412,12 +439,11 @@ class PPOTask(RLTask[Config], Generic[Config], ABC):
             rewards: Rewards,
             rng: PRNGKeyArray,
         ) -> tuple[Array, FrozenDict[str, Array]]:
-            rng, rng1, rng2, rng3, rng4 = jax.random.split(rng, 5)
+            rng, rng1, rng2, rng3 = jax.random.split(rng, 4)
 
             on_policy_log_probs_tn = jax.lax.stop_gradient(self.get_on_policy_log_probs(model, trajectories, rng1))
             on_policy_values_t = jax.lax.stop_gradient(self.get_on_policy_values(model, trajectories, rng2))
-            log_probs_tn, entropy_tn = self.get_log_probs(model, trajectories, rng3)
-            values_t = self.get_values(model, trajectories, rng4)
+            log_probs_tn, entropy_tn, values_t = self.get_log_probs_and_values(model, trajectories, rng3)
 
             advantages_t, value_targets_t = compute_advantages_and_value_targets(
                 values_t=jax.lax.stop_gradient(values_t),
@@ -100,18 +100,27 @@ def get_rewards(
     clip_max: float | None = None,
 ) -> Rewards:
     """Get the rewards from the physics state."""
-    rewards = {}
+    reward_names = []
+    reward_vals = []
     target_shape = trajectory.done.shape
     for reward_generator in reward_generators:
         reward_name = reward_generator.reward_name
         reward_val = reward_generator(trajectory) * reward_generator.scale * ctrl_dt
         if reward_val.shape != trajectory.done.shape:
             raise AssertionError(f"Reward {reward_name} shape {reward_val.shape} does not match {target_shape}")
-        if clip_max is not None:
-            reward_val = jnp.clip(reward_val, -clip_max, clip_max)
-        rewards[reward_generator.reward_name] = reward_val
-    total_reward = jax.tree.reduce(jnp.add, list(rewards.values()))
-    return Rewards(total=total_reward, components=FrozenDict(rewards))
+        reward_names.append(reward_name)
+        reward_vals.append(reward_val)
+    for name, count in Counter(reward_names).items():
+        if count > 1:
+            raise ValueError(f"Found duplicate reward name: {name}. Rewards: {reward_names}")
+
+    # Stacks the rewards so that the clipping and the total are computed as
+    # single operations over all the reward terms.
+    rewards_n = jnp.stack(reward_vals)
+    if clip_max is not None:
+        rewards_n = jnp.clip(rewards_n, -clip_max, clip_max)
+    total_reward = rewards_n.sum(axis=0)
+    return Rewards(total=total_reward, components=FrozenDict(zip(reward_names, rewards_n)))
 
 
 def get_terminations(
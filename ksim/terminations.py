@@ -13,6 +13,7 @@ __all__ = [
 
 import functools
 import logging
+import math
 from abc import ABC, abstractmethod
 from typing import Collection, Literal, Self
 
@@ -30,6 +31,26 @@ logger = logging.getLogger(__name__)
 SensorType = Literal["quaternion_orientation", "gravity_vector", "base_orientation"]
 
 
+def _angle_exceeds(y: Array, x: Array, max_angle: float) -> Array:
+    """Checks if `|atan2(y, x)| > max_angle` without computing the arctangent.
+
+    Since cosine is decreasing on [0, pi], this is the same as checking that
+    `x < cos(max_angle) * sqrt(x^2 + y^2)`, which we can compare in squared
+    form once the signs of both sides are known.
+    """
+    if max_angle < 0.0:
+        return jnp.ones_like(x, dtype=jnp.bool_)
+    cos_max = math.cos(min(max_angle, math.pi))
+    norm_sq = x * x + y * y
+    if cos_max >= 0.0:
+        return (x < 0.0) | (x * x < cos_max**2 * norm_sq)
+    return (x < 0.0) & (x * x > cos_max**2 * norm_sq)
+
+
+def _sorted_array(x: Array) -> Array:
+    return jnp.sort(jnp.asarray(x))
+
+
 @attrs.define(frozen=True, kw_only=True)
 class Termination(ABC):
     """Base class for terminations."""
@@ -54,8 +75,9 @@ class PitchTooGreatTermination(Termination):
 
     def __call__(self, state: PhysicsData) -> Array:
         quat = state.qpos[3:7]
-        pitch = jnp.arctan2(2 * quat[1] * quat[2] - 2 * quat[0] * quat[3], 1 - 2 * quat[1] ** 2 - 2 * quat[2] ** 2)
-        return jnp.abs(pitch) > self.max_pitch
+        y = 2 * quat[1] * quat[2] - 2 * quat[0] * quat[3]
+        x = 1 - 2 * quat[1] ** 2 - 2 * quat[2] ** 2
+        return _angle_exceeds(y, x, self.max_pitch)
 
 
 @attrs.define(frozen=True, kw_only=True)
@@ -66,8 +88,9 @@ class RollTooGreatTermination(Termination):
 
     def __call__(self, state: PhysicsData) -> Array:
         quat = state.qpos[3:7]
-        roll = jnp.arctan2(2 * quat[1] * quat[2] + 2 * quat[0] * quat[3], 1 - 2 * quat[2] ** 2 - 2 * quat[3] ** 2)
-        return jnp.abs(roll) > self.max_roll
+        y = 2 * quat[1] * quat[2] + 2 * quat[0] * quat[3]
+        x = 1 - 2 * quat[2] ** 2 - 2 * quat[3] ** 2
+        return _angle_exceeds(y, x, self.max_roll)
 
 
 @attrs.define(frozen=True, kw_only=True)
@@ -95,11 +118,11 @@ class FallTermination(Termination):
         match self.sensor_type:
             case "quaternion_orientation":
                 quat = state.qpos[3:7]
-                pitch = jnp.arctan2(
+                return _angle_exceeds(
                     2 * quat[1] * quat[2] - 2 * quat[0] * quat[3],
                     1 - 2 * quat[1] ** 2 - 2 * quat[2] ** 2,
+                    self.max_pitch,
                 )
-                return jnp.abs(pitch) > self.max_pitch
 
             case "gravity_vector":
                 gravity = state.sensor[self.sensor_name]  # ML: does this exist?
@@ -107,11 +130,11 @@ class FallTermination(Termination):
 
             case "base_orientation":
                 quat = state.qpos[3:7]
-                pitch = jnp.arctan2(
+                return _angle_exceeds(
                     2 * quat[1] * quat[2] - 2 * quat[0] * quat[3],
                     1 - 2 * quat[1] ** 2 - 2 * quat[2] ** 2,
+                    self.max_pitch,
                 )
-                return jnp.abs(pitch) > self.max_pitch
 
     @classmethod
     def create_from_quaternion_sensor(cls, physics_model: PhysicsModel, quaternion_sensor: str) -> Self:
@@ -159,21 +182,38 @@ class FallTermination(Termination):
 
 @attrs.define(frozen=True, kw_only=True)
 class IllegalContactTermination(Termination):
-    """Terminates when illegal contact is detected between specified geoms."""
+    """Terminates when illegal contact is detected between specified geoms.
+
+    If `illegal_geom_mask` is provided, it should be a boolean array with one
+    entry per geom in the model, which is used to look up each contact's
+    geoms directly. Otherwise, each contact's geoms are binary searched in
+    `illegal_geom_idxs`, which is sorted on construction.
+    """
 
-    illegal_geom_idxs: jax.Array
+    illegal_geom_idxs: jax.Array = attrs.field(converter=_sorted_array)
+    illegal_geom_mask: jax.Array | None = None
     contact_eps: float = -0.001
 
     def __call__(self, state: PhysicsData) -> Array:
         if state.ncon == 0:
             return jnp.array(False)
 
-        illegal_geom1 = jnp.isin(state.contact.geom1, self.illegal_geom_idxs)
-        illegal_geom2 = jnp.isin(state.contact.geom2, self.illegal_geom_idxs)
-        illegal_contact = jnp.logical_or(illegal_geom1, illegal_geom2)
-        significant_contact = jnp.where(illegal_contact, state.contact.dist < self.contact_eps, False).any()
+        if self.illegal_geom_mask is None:
+            illegal_geom1 = self._is_illegal_geom(state.contact.geom1)
+            illegal_geom2 = self._is_illegal_geom(state.contact.geom2)
+        else:
+            illegal_geom1 = self.illegal_geom_mask[state.contact.geom1]
+            illegal_geom2 = self.illegal_geom_mask[state.contact.geom2]
+        illegal_contact = illegal_geom1 | illegal_geom2
+        significant_contact = state.contact.dist < self.contact_eps
+
+        return jnp.any(illegal_contact & significant_contact)
 
-        return jnp.array(significant_contact)
+    def _is_illegal_geom(self, geom: Array) -> Array:
+        if self.illegal_geom_idxs.size == 0:
+            return jnp.zeros_like(geom, dtype=jnp.bool_)
+        idxs = jnp.clip(jnp.searchsorted(self.illegal_geom_idxs, geom), 0, self.illegal_geom_idxs.shape[0] - 1)
+        return self.illegal_geom_idxs[idxs] == geom
 
     def __hash__(self) -> int:
         """Convert JAX arrays to tuples for hashing."""
@@ -198,10 +238,12 @@ class IllegalContactTermination(Termination):
             raise ValueError(f"Geoms {geom_name_set} not found in model. Choices are: {choices}")
 
         illegal_geom_idxs = jnp.array(illegal_geom_idxs)
+        illegal_geom_mask = jnp.zeros(physics_model.ngeom, dtype=jnp.bool_).at[illegal_geom_idxs].set(True)
 
         return cls(
             contact_eps=contact_eps,
             illegal_geom_idxs=illegal_geom_idxs,
+            illegal_geom_mask=illegal_geom_mask,
         )
 
 
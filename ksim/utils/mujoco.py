@@ -14,6 +14,7 @@ __all__ = [
     "update_model_field",
     "update_data_field",
     "slice_update",
+    "load_mjcf_model",
     "quat_to_mat",
     "mat_to_quat",
     "get_body_pose",
@@ -22,7 +23,10 @@ __all__ = [
     "get_geom_pose_by_name",
 ]
 
+import copy
+import functools
 import logging
+from pathlib import Path
 from typing import Any, Hashable, TypeVar
 
 import jax
@@ -230,6 +234,27 @@ def slice_update(
     raise ValueError(f"Model type {type(model)} not supported")
 
 
+@functools.lru_cache(maxsize=4)
+def _parse_mjcf_model(path: str) -> mujoco.MjModel:
+    return mujoco.MjModel.from_xml_path(path)
+
+
+def load_mjcf_model(path: str | Path) -> mujoco.MjModel:
+    """Loads a Mujoco model from an MJCF file.
+
+    The parsed model is cached by path, so repeated calls skip parsing and
+    compiling the MJCF. Each call returns a separate copy, so callers can
+    change the model options without affecting each other.
+
+    Args:
+        path: The path to the MJCF file.
+
+    Returns:
+        The Mujoco model.
+    """
+    return copy.deepcopy(_parse_mjcf_model(Path(path).resolve().as_posix()))
+
+
 def load_model(model: mujoco.MjModel) -> mjx.Model:
     mjx_model = mjx.put_model(model)
     mjx_model = jax.tree.map(jnp.array, mjx_model)
@@ -68,6 +68,17 @@ class TestLinearVelocityCommand:
             atol=_TOL,
         )
 
+    def test_nonzero_axes(self) -> None:
+        """Test that axes which are always zero are excluded from the nonzero axes."""
+        cmd = ksim.LinearVelocityCommand(x_range=(-1.0, 1.0), y_range=(-2.0, 2.0))
+        assert cmd.nonzero_axes == (0, 1)
+
+        cmd = ksim.LinearVelocityCommand(x_range=(-1.0, 1.0), y_range=(0.0, 0.0))
+        assert cmd.nonzero_axes == (0,)
+
+        cmd = ksim.LinearVelocityCommand(x_range=(-1.0, 1.0), y_range=(-2.0, 2.0), x_zero_prob=1.0)
+        assert cmd.nonzero_axes == (1,)
+
     def test_update_mechanism(self, rng: jax.Array) -> None:
         """Test that the command update mechanism works correctly."""
         cmd = ksim.LinearVelocityCommand(x_range=(-1.0, 1.0), y_range=(-2.0, 2.0))
@@ -78,6 +89,25 @@ class TestLinearVelocityCommand:
         assert jnp.array_equal(next_command, command)
 
 
+class TestLinearVelocityStepCommand:
+    """Tests for the LinearVelocityStepCommand class."""
+
+    def test_nonzero_axes(self) -> None:
+        """Test that axes which are always zero are excluded from the nonzero axes."""
+        cmd = ksim.LinearVelocityStepCommand(
+            x_range=(0.0, 3.0),
+            y_range=(0.0, 0.0),
+            x_fwd_prob=0.8,
+            y_fwd_prob=0.5,
+            x_zero_prob=0.2,
+            y_zero_prob=0.8,
+        )
+        assert cmd.nonzero_axes == (0,)
+
+        cmd = ksim.LinearVelocityStepCommand(x_range=(0.0, 3.0), y_range=(-1.0, 1.0), x_fwd_prob=0.5, y_fwd_prob=0.5)
+        assert cmd.nonzero_axes == (0, 1)
+
+
 class TestAngularVelocityCommand:
     """Tests for the AngularVelocityCommand class."""
 
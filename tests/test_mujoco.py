@@ -0,0 +1,20 @@
+"""Tests for the MuJoCo utilities in the ksim package."""
+
+from pathlib import Path
+
+import ksim
+
+MJCF_PATH = Path(__file__).parent / "fixed_assets" / "scene.mjcf"
+
+
+def test_load_mjcf_model_returns_copies() -> None:
+    """Test that cached models are returned as independent copies."""
+    model_a = ksim.load_mjcf_model(str(MJCF_PATH))
+    model_b = ksim.load_mjcf_model(MJCF_PATH)
+    assert model_a is not model_b
+    assert model_a.ngeom == model_b.ngeom
+
+    original_timestep = model_b.opt.timestep
+    model_a.opt.timestep = original_timestep * 2
+    assert model_b.opt.timestep == original_timestep
+    assert ksim.load_mjcf_model(MJCF_PATH).opt.timestep == original_timestep
@@ -6,6 +6,7 @@ import attrs
 import jax
 import jax.numpy as jnp
 import mujoco
+import pytest
 from jaxtyping import Array
 
 import ksim
@@ -77,6 +78,21 @@ class TestPitchTooGreatTermination:
         result = term(data)
         assert not result.item()
 
+    @pytest.mark.parametrize("max_pitch", [-0.1, 0.0, 0.3, 1.5, 2.5, 3.5])
+    def test_pitch_matches_arctan2(self, max_pitch: float) -> None:
+        """Test that the PitchTooGreatTermination matches a direct arctan2 computation."""
+        data = DummyMjxData()
+        # Includes the identity rotation, where the angle is exactly zero.
+        quats = jax.random.normal(jax.random.PRNGKey(0), (64, 4)).at[0].set(jnp.array([1.0, 0.0, 0.0, 0.0]))
+        term = ksim.PitchTooGreatTermination(max_pitch=max_pitch)
+        for quat in quats:
+            data.qpos = data.qpos.at[3:7].set(quat)
+            pitch = jnp.arctan2(
+                2 * quat[1] * quat[2] - 2 * quat[0] * quat[3],
+                1 - 2 * quat[1] ** 2 - 2 * quat[2] ** 2,
+            )
+            assert term(data).item() == (jnp.abs(pitch) > max_pitch).item()
+
 
 class TestRollTooGreatTermination:
     """Tests for the RollTooGreatTermination class."""
@@ -95,6 +111,21 @@ class TestRollTooGreatTermination:
         result = term(data)
         assert not result.item()
 
+    @pytest.mark.parametrize("max_roll", [-0.1, 0.0, 0.3, 1.5, 2.5, 3.5])
+    def test_roll_matches_arctan2(self, max_roll: float) -> None:
+        """Test that the RollTooGreatTermination matches a direct arctan2 computation."""
+        data = DummyMjxData()
+        # Includes the identity rotation, where the angle is exactly zero.
+        quats = jax.random.normal(jax.random.PRNGKey(1), (64, 4)).at[0].set(jnp.array([1.0, 0.0, 0.0, 0.0]))
+        term = ksim.RollTooGreatTermination(max_roll=max_roll)
+        for quat in quats:
+            data.qpos = data.qpos.at[3:7].set(quat)
+            roll = jnp.arctan2(
+                2 * quat[1] * quat[2] + 2 * quat[0] * quat[3],
+                1 - 2 * quat[2] ** 2 - 2 * quat[3] ** 2,
+            )
+            assert term(data).item() == (jnp.abs(roll) > max_roll).item()
+
 
 class TestMinimumHeightTermination:
     """Tests for the MinimumHeightTermination class."""
@@ -136,9 +167,32 @@ class TestIllegalContactTermination:
         result = term(data_no_contact)
         assert not result.item()
 
+    def test_illegal_contact_termination_mask(self) -> None:
+        """Test that the IllegalContactTermination gives the same result when using a geom mask."""
+        data = DummyMjxData()
+        mask = jnp.zeros(6, dtype=jnp.bool_).at[jnp.array([0, 3])].set(True)
+        term = ksim.IllegalContactTermination(illegal_geom_idxs=jnp.array([0, 3]), illegal_geom_mask=mask)
+        result = term(data)
+        assert result.item()
+
+        mask = jnp.zeros(6, dtype=jnp.bool_).at[jnp.array([4, 5])].set(True)
+        term = ksim.IllegalContactTermination(illegal_geom_idxs=jnp.array([4, 5]), illegal_geom_mask=mask)
+        result = term(data)
+        assert not result.item()
+
+    def test_illegal_contact_termination_unsorted(self) -> None:
+        """Test that the geom search works when the illegal geoms are out of order or empty."""
+        data = DummyMjxData()
+        for idxs, expected in (([3, 0], True), ([5, 2, 4], True), ([5, 4], False), ([4], False), ([], False)):
+            term = ksim.IllegalContactTermination(illegal_geom_idxs=jnp.array(idxs, dtype=jnp.int32))
+            assert term(data).item() == expected
+
     def test_illegal_contact_termination_builder(self, humanoid_model: mujoco.MjModel) -> None:
         """Test that the IllegalContactTerminationBuilder creates a termination function."""
         geom_names = ["hand_left", "hand_right"]
         term = ksim.IllegalContactTermination.create(humanoid_model, geom_names=geom_names)
         assert term.termination_name == "illegal_contact_termination"
         assert term.illegal_geom_idxs.shape == (2,)
+        assert term.illegal_geom_mask is not None
+        assert term.illegal_geom_mask.shape == (humanoid_model.ngeom,)
+        assert term.illegal_geom_mask.sum().item() == 2